@@ -10,24 +10,13 @@ http://opensource.org/licenses/MIT
 """
 
 from __future__ import division
+import os
+from bisect import bisect_right
 import numpy as np
-from scipy.interpolate import interp1d
-from scipy.optimize import brentq
-
-try:
-    from scipy.misc import derivative
-except ImportError:
-    import numdifftools as nd
-    def derivative(func, x0, dx=1.0, n=1, args=(), order=3):
-        """
-        Replacing scipy.misc.derivative, but ignoring dx and order
-        Thanks to @junobonnie for the suggestion
-        """
-        f = nd.Derivative(func, n=n)
-        return f(x0, *args)
 
 
-__all__ = ['TracyWidom']
+__all__ = ['TracyWidom', 'generate_table', 'wishart_scaling',  # noqa: F822
+           'largest_eigenvalue_pvalue', 'kth_eigenvalue_pvalue', 'tracywidom_gen']
 __version__ = '0.4.0'
 
 _digits_1 = b'\xc6\'\x00\x00\xd1(\x00\x00\xe2)\x00\x00\xf9*\x00\x00\x16,\x00\x009-\x00\x00c.\x00\x00\x93/\x00\x00\xc90\x00\x00\x062\x00\x00J3\x00\x00\x944\x00\x00\xe65\x00\x00>7\x00\x00\x9e8\x00\x00\x05:\x00\x00s;\x00\x00\xe9<\x00\x00f>\x00\x00\xeb?\x00\x00xA\x00\x00\rC\x00\x00\xa9D\x00\x00NF\x00\x00\xfbG\x00\x00\xb1I\x00\x00oK\x00\x005M\x00\x00\x05O\x00\x00\xddP\x00\x00\xbeR\x00\x00\xa8T\x00\x00\x9bV\x00\x00\x98X\x00\x00\x9eZ\x00\x00\xae\\\x00\x00\xc7^\x00\x00\xea`\x00\x00\x17c\x00\x00Ne\x00\x00\x8fg\x00\x00\xdai\x00\x000l\x00\x00\x90n\x00\x00\xfap\x00\x00ps\x00\x00\xf0u\x00\x00|x\x00\x00\x12{\x00\x00\xb4}\x00\x00a\x80\x00\x00\x19\x83\x00\x00\xdd\x85\x00\x00\xad\x88\x00\x00\x88\x8b\x00\x00o\x8e\x00\x00c\x91\x00\x00b\x94\x00\x00n\x97\x00\x00\x87\x9a\x00\x00\xab\x9d\x00\x00\xdd\xa0\x00\x00\x1b\xa4\x00\x00f\xa7\x00\x00\xbe\xaa\x00\x00#\xae\x00\x00\x95\xb1\x00\x00\x14\xb5\x00\x00\xa1\xb8\x00\x00<\xbc\x00\x00\xe4\xbf\x00\x00\x9a\xc3\x00\x00]\xc7\x00\x00/\xcb\x00\x00\x0e\xcf\x00\x00\xfc\xd2\x00\x00\xf8\xd6\x00\x00\x03\xdb\x00\x00\x1c\xdf\x00\x00C\xe3\x00\x00y\xe7\x00\x00\xbe\xeb\x00\x00\x12\xf0\x00\x00u\xf4\x00\x00\xe6\xf8\x00\x00g\xfd\x00\x00\xf7\x01\x01\x00\x97\x06\x01\x00E\x0b\x01\x00\x04\x10\x01\x00\xd1\x14\x01\x00\xaf\x19\x01\x00\x9c\x1e\x01\x00\x99#\x01\x00\xa6(\x01\x00\xc3-\x01\x00\xf02\x01\x00-8\x01\x00z=\x01\x00\xd7B\x01\x00EH\x01\x00\xc3M\x01\x00RS\x01\x00\xf1X\x01\x00\xa0^\x01\x00`d\x01\x001j\x01\x00\x13p\x01\x00\x05v\x01\x00\x08|\x01\x00\x1c\x82\x01\x00A\x88\x01\x00v\x8e\x01\x00\xbd\x94\x01\x00\x15\x9b\x01\x00}\xa1\x01\x00\xf7\xa7\x01\x00\x82\xae\x01\x00\x1e\xb5\x01\x00\xcb\xbb\x01\x00\x8a\xc2\x01\x00Y\xc9\x01\x00:\xd0\x01\x00,\xd7\x01\x00/\xde\x01\x00C\xe5\x01\x00i\xec\x01\x00\xa0\xf3\x01\x00\xe8\xfa\x01\x00A\x02\x02\x00\xab\t\x02\x00\'\x11\x02\x00\xb4\x18\x02\x00R \x02\x00\x02(\x02\x00\xc2/\x02\x00\x947\x02\x00w?\x02\x00jG\x02\x00oO\x02\x00\x85W\x02\x00\xac_\x02\x00\xe4g\x02\x00-p\x02\x00\x87x\x02\x00\xf1\x80\x02\x00l\x89\x02\x00\xf8\x91\x02\x00\x95\x9a\x02\x00B\xa3\x02\x00\x00\xac\x02\x00\xce\xb4\x02\x00\xad\xbd\x02\x00\x9c\xc6\x02\x00\x9c\xcf\x02\x00\xab\xd8\x02\x00\xcb\xe1\x02\x00\xfb\xea\x02\x00:\xf4\x02\x00\x8a\xfd\x02\x00\xe9\x06\x03\x00Y\x10\x03\x00\xd7\x19\x03\x00f#\x03\x00\x03-\x03\x00\xb06\x03\x00l@\x03\x008J\x03\x00\x12T\x03\x00\xfb]\x03\x00\xf3g\x03\x00\xfaq\x03\x00\x0f|\x03\x002\x86\x03\x00d\x90\x03\x00\xa4\x9a\x03\x00\xf2\xa4\x03\x00N\xaf\x03\x00\xb8\xb9\x03\x00/\xc4\x03\x00\xb4\xce\x03\x00G\xd9\x03\x00\xe6\xe3\x03\x00\x93\xee\x03\x00L\xf9\x03\x00\x12\x04\x04\x00\xe5\x0e\x04\x00\xc4\x19\x04\x00\xb0$\x04\x00\xa8/\x04\x00\xab:\x04\x00\xbbE\x04\x00\xd6P\x04\x00\xfd[\x04\x00/g\x04\x00lr\x04\x00\xb4}\x04\x00\x07\x89\x04\x00e\x94\x04\x00\xcd\x9f\x04\x00?\xab\x04\x00\xbc\xb6\x04\x00B\xc2\x04\x00\xd3\xcd\x04\x00l\xd9\x04\x00\x0f\xe5\x04\x00\xbc\xf0\x04\x00q\xfc\x04\x00/\x08\x05\x00\xf6\x13\x05\x00\xc5\x1f\x05\x00\x9c+\x05\x00|7\x05\x00cC\x05\x00RO\x05\x00H[\x05\x00Fg\x05\x00Js\x05\x00V\x7f\x05\x00h\x8b\x05\x00\x80\x97\x05\x00\x9f\xa3\x05\x00\xc3\xaf\x05\x00\xee\xbb\x05\x00\x1e\xc8\x05\x00T\xd4\x05\x00\x8e\xe0\x05\x00\xce\xec\x05\x00\x13\xf9\x05\x00\\\x05\x06\x00\xa9\x11\x06\x00\xfb\x1d\x06\x00P*\x06\x00\xa96\x06\x00\x06C\x06\x00fO\x06\x00\xc9[\x06\x00/h\x06\x00\x98t\x06\x00\x03\x81\x06\x00q\x8d\x06\x00\xe0\x99\x06\x00Q\xa6\x06\x00\xc4\xb2\x06\x009\xbf\x06\x00\xae\xcb\x06\x00%\xd8\x06\x00\x9c\xe4\x06\x00\x14\xf1\x06\x00\x8c\xfd\x06\x00\x05\n\x07\x00}\x16\x07\x00\xf5"\x07\x00m/\x07\x00\xe3;\x07\x00ZH\x07\x00\xceT\x07\x00Ba\x07\x00\xb4m\x07\x00%z\x07\x00\x93\x86\x07\x00\x00\x93\x07\x00j\x9f\x07\x00\xd2\xab\x07\x007\xb8\x07\x00\x99\xc4\x07\x00\xf8\xd0\x07\x00S\xdd\x07\x00\xac\xe9\x07\x00\x00\xf6\x07\x00Q\x02\x08\x00\x9e\x0e\x08\x00\xe6\x1a\x08\x00*\'\x08\x00i3\x08\x00\xa4?\x08\x00\xd9K\x08\x00\nX\x08\x005d\x08\x00Zp\x08\x00z|\x08\x00\x94\x88\x08\x00\xa8\x94\x08\x00\xb5\xa0\x08\x00\xbc\xac\x08\x00\xbd\xb8\x08\x00\xb7\xc4\x08\x00\xaa\xd0\x08\x00\x95\xdc\x08\x00z\xe8\x08\x00W\xf4\x08\x00-\x00\t\x00\xfb\x0b\t\x00\xc1\x17\t\x00\x7f#\t\x004/\t\x00\xe2:\t\x00\x87F\t\x00#R\t\x00\xb6]\t\x00Ai\t\x00\xc2t\t\x00:\x80\t\x00\xa9\x8b\t\x00\x0e\x97\t\x00j\xa2\t\x00\xbc\xad\t\x00\x04\xb9\t\x00B\xc4\t\x00v\xcf\t\x00\x9f\xda\t\x00\xbf\xe5\t\x00\xd3\xf0\t\x00\xdd\xfb\t\x00\xdc\x06\n\x00\xd1\x11\n\x00\xba\x1c\n\x00\x98\'\n\x00k2\n\x003=\n\x00\xefG\n\x00\xa0R\n\x00E]\n\x00\xdfg\n\x00lr\n\x00\xee|\n\x00d\x87\n\x00\xcd\x91\n\x00+\x9c\n\x00|\xa6\n\x00\xc1\xb0\n\x00\xf9\xba\n\x00%\xc5\n\x00D\xcf\n\x00W\xd9\n\x00]\xe3\n\x00V\xed\n\x00B\xf7\n\x00!\x01\x0b\x00\xf3\n\x0b\x00\xb8\x14\x0b\x00p\x1e\x0b\x00\x1b(\x0b\x00\xb81\x0b\x00H;\x0b\x00\xcbD\x0b\x00@N\x0b\x00\xa8W\x0b\x00\x02a\x0b\x00Oj\x0b\x00\x8es\x0b\x00\xc0|\x0b\x00\xe3\x85\x0b\x00\xf9\x8e\x0b\x00\x02\x98\x0b\x00\xfc\xa0\x0b\x00\xe9\xa9\x0b\x00\xc7\xb2\x0b\x00\x98\xbb\x0b\x00[\xc4\x0b\x00\x10\xcd\x0b\x00\xb7\xd5\x0b\x00P\xde\x0b\x00\xdb\xe6\x0b\x00X\xef\x0b\x00\xc7\xf7\x0b\x00(\x00\x0c\x00{\x08\x0c\x00\xbf\x10\x0c\x00\xf6\x18\x0c\x00\x1e!\x0c\x009)\x0c\x00E1\x0c\x00C9\x0c\x003A\x0c\x00\x15I\x0c\x00\xe9P\x0c\x00\xaeX\x0c\x00f`\x0c\x00\x0fh\x0c\x00\xabo\x0c\x008w\x0c\x00\xb7~\x0c\x00(\x86\x0c\x00\x8c\x8d\x0c\x00\xe1\x94\x0c\x00(\x9c\x0c\x00a\xa3\x0c\x00\x8c\xaa\x0c\x00\xa9\xb1\x0c\x00\xb8\xb8\x0c\x00\xb9\xbf\x0c\x00\xad\xc6\x0c\x00\x92\xcd\x0c\x00j\xd4\x0c\x004\xdb\x0c\x00\xf0\xe1\x0c\x00\x9e\xe8\x0c\x00?\xef\x0c\x00\xd2\xf5\x0c\x00W\xfc\x0c\x00\xcf\x02\r\x009\t\r\x00\x96\x0f\r\x00\xe5\x15\r\x00\'\x1c\r\x00["\r\x00\x82(\r\x00\x9b.\r\x00\xa84\r\x00\xa7:\r\x00\x99@\r\x00}F\r\x00UL\r\x00 R\r\x00\xddW\r\x00\x8e]\r\x002c\r\x00\xc9h\r\x00Sn\r\x00\xd0s\r\x00Ay\r\x00\xa5~\r\x00\xfc\x83\r\x00G\x89\r\x00\x86\x8e\r\x00\xb8\x93\r\x00\xde\x98\r\x00\xf7\x9d\r\x00\x04\xa3\r\x00\x05\xa8\r\x00\xfa\xac\r\x00\xe3\xb1\r\x00\xc0\xb6\r\x00\x91\xbb\r\x00V\xc0\r\x00\x10\xc5\r\x00\xbd\xc9\r\x00_\xce\r\x00\xf6\xd2\r\x00\x81\xd7\r\x00\x00\xdc\r\x00t\xe0\r\x00\xdd\xe4\r\x00:\xe9\r\x00\x8c\xed\r\x00\xd3\xf1\r\x00\x0f\xf6\r\x00@\xfa\r\x00f\xfe\r\x00\x82\x02\x0e\x00\x92\x06\x0e\x00\x98\n\x0e\x00\x93\x0e\x0e\x00\x83\x12\x0e\x00i\x16\x0e\x00E\x1a\x0e\x00\x16\x1e\x0e\x00\xdd!\x0e\x00\x99%\x0e\x00L)\x0e\x00\xf4,\x0e\x00\x920\x0e\x00\'4\x0e\x00\xb17\x0e\x002;\x0e\x00\xa9>\x0e\x00\x16B\x0e\x00zE\x0e\x00\xd4H\x0e\x00%L\x0e\x00lO\x0e\x00\xaaR\x0e\x00\xdfU\x0e\x00\x0bY\x0e\x00-\\\x0e\x00G_\x0e\x00Wb\x0e\x00_e\x0e\x00^h\x0e\x00Tk\x0e\x00Bn\x0e\x00\'q\x0e\x00\x03t\x0e\x00\xd7v\x0e\x00\xa3y\x0e\x00f|\x0e\x00!\x7f\x0e\x00\xd4\x81\x0e\x00\x7f\x84\x0e\x00!\x87\x0e\x00\xbc\x89\x0e\x00O\x8c\x0e\x00\xda\x8e\x0e\x00]\x91\x0e\x00\xd9\x93\x0e\x00M\x96\x0e\x00\xba\x98\x0e\x00\x1f\x9b\x0e\x00|\x9d\x0e\x00\xd2\x9f\x0e\x00!\xa2\x0e\x00i\xa4\x0e\x00\xaa\xa6\x0e\x00\xe3\xa8\x0e\x00\x16\xab\x0e\x00B\xad\x0e\x00f\xaf\x0e\x00\x84\xb1\x0e\x00\x9b\xb3\x0e\x00\xac\xb5\x0e\x00\xb6\xb7\x0e\x00\xb9\xb9\x0e\x00\xb6\xbb\x0e\x00\xad\xbd\x0e\x00\x9d\xbf\x0e\x00\x86\xc1\x0e\x00j\xc3\x0e\x00G\xc5\x0e\x00\x1f\xc7\x0e\x00\xf0\xc8\x0e\x00\xbb\xca\x0e\x00\x80\xcc\x0e\x00@\xce\x0e\x00\xfa\xcf\x0e\x00\xad\xd1\x0e\x00\\\xd3\x0e\x00\x04\xd5\x0e\x00\xa7\xd6\x0e\x00E\xd8\x0e\x00\xdd\xd9\x0e\x00p\xdb\x0e\x00\xfd\xdc\x0e\x00\x85\xde\x0e\x00\x08\xe0\x0e\x00\x86\xe1\x0e\x00\xff\xe2\x0e\x00r\xe4\x0e\x00\xe1\xe5\x0e\x00J\xe7\x0e\x00\xaf\xe8\x0e\x00\x0f\xea\x0e\x00j\xeb\x0e\x00\xc1\xec\x0e\x00\x12\xee\x0e\x00`\xef\x0e\x00\xa8\xf0\x0e\x00\xec\xf1\x0e\x00,\xf3\x0e\x00g\xf4\x0e\x00\x9e\xf5\x0e\x00\xd0\xf6\x0e\x00\xff\xf7\x0e\x00)\xf9\x0e\x00N\xfa\x0e\x00p\xfb\x0e\x00\x8e\xfc\x0e\x00\xa8\xfd\x0e\x00\xbd\xfe\x0e\x00\xcf\xff\x0e\x00\xdd\x00\x0f\x00\xe7\x01\x0f\x00\xed\x02\x0f\x00\xf0\x03\x0f\x00\xef\x04\x0f\x00\xea\x05\x0f\x00\xe2\x06\x0f\x00\xd6\x07\x0f\x00\xc6\x08\x0f\x00\xb3\t\x0f\x00\x9d\n\x0f\x00\x83\x0b\x0f\x00f\x0c\x0f\x00F\r\x0f\x00"\x0e\x0f\x00\xfb\x0e\x0f\x00\xd1\x0f\x0f\x00\xa4\x10\x0f\x00s\x11\x0f\x00@\x12\x0f\x00\n\x13\x0f\x00\xd0\x13\x0f\x00\x94\x14\x0f\x00U\x15\x0f\x00\x12\x16\x0f\x00\xcd\x16\x0f\x00\x86\x17\x0f\x00;\x18\x0f\x00\xee\x18\x0f\x00\x9e\x19\x0f\x00K\x1a\x0f\x00\xf6\x1a\x0f\x00\x9e\x1b\x0f\x00D\x1c\x0f\x00\xe7\x1c\x0f\x00\x87\x1d\x0f\x00&\x1e\x0f\x00\xc1\x1e\x0f\x00[\x1f\x0f\x00\xf2\x1f\x0f\x00\x86 \x0f\x00\x19!\x0f\x00\xa9!\x0f\x007"\x0f\x00\xc2"\x0f\x00L#\x0f\x00\xd3#\x0f\x00X$\x0f\x00\xdc$\x0f\x00]%\x0f\x00\xdc%\x0f\x00Y&\x0f\x00\xd4&\x0f\x00M\'\x0f\x00\xc4\'\x0f\x00:(\x0f\x00\xad(\x0f\x00\x1f)\x0f\x00\x8f)\x0f\x00\xfd)\x0f\x00i*\x0f\x00\xd4*\x0f\x00=+\x0f\x00\xa4+\x0f\x00\t,\x0f\x00m,\x0f\x00\xcf,\x0f\x000-\x0f\x00\x8f-\x0f\x00\xed-\x0f\x00I.\x0f\x00\xa3.\x0f\x00\xfc.\x0f\x00T/\x0f\x00\xaa/\x0f\x00\xff/\x0f\x00R0\x0f\x00\xa40\x0f\x00\xf50\x0f\x00D1\x0f\x00\x921\x0f\x00\xdf1\x0f\x00*2\x0f\x00t2\x0f\x00\xbd2\x0f\x00\x053\x0f\x00L3\x0f\x00\x913\x0f\x00\xd53\x0f\x00\x184\x0f\x00Z4\x0f\x00\x9b4\x0f\x00\xda4\x0f\x00\x195\x0f\x00W5\x0f\x00\x935\x0f\x00\xcf5\x0f\x00\t6\x0f\x00C6\x0f\x00{6\x0f\x00\xb36\x0f\x00\xe96\x0f\x00\x1f7\x0f\x00S7\x0f\x00\x877\x0f\x00\xba7\x0f\x00\xec7\x0f\x00\x1d8\x0f\x00N8\x0f\x00}8\x0f\x00\xac8\x0f\x00\xda8\x0f\x00\x079\x0f\x0039\x0f\x00^9\x0f\x00\x899\x0f\x00\xb39\x0f\x00\xdc9\x0f\x00\x05:\x0f\x00,:\x0f\x00T:\x0f\x00z:\x0f\x00\xa0:\x0f\x00\xc5:\x0f\x00\xe9:\x0f\x00\r;\x0f\x000;\x0f\x00R;\x0f\x00t;\x0f\x00\x96;\x0f\x00\xb6;\x0f\x00\xd6;\x0f\x00\xf6;\x0f\x00\x15<\x0f\x003<\x0f\x00Q<\x0f\x00n<\x0f\x00\x8b<\x0f\x00\xa7<\x0f\x00\xc3<\x0f\x00\xde<\x0f\x00\xf9<\x0f\x00\x13=\x0f\x00-=\x0f\x00F=\x0f\x00_=\x0f\x00w=\x0f\x00\x8f=\x0f\x00\xa7=\x0f\x00\xbe=\x0f\x00\xd4=\x0f\x00\xeb=\x0f\x00\x00>\x0f\x00\x16>\x0f\x00+>\x0f\x00?>\x0f\x00T>\x0f\x00g>\x0f\x00{>\x0f\x00\x8e>\x0f\x00\xa1>\x0f\x00\xb3>\x0f\x00\xc5>\x0f\x00\xd7>\x0f\x00\xe8>\x0f\x00\xfa>\x0f\x00\n?\x0f\x00\x1b?\x0f\x00+?\x0f\x00;?\x0f\x00J?\x0f\x00Y?\x0f\x00h?\x0f\x00w?\x0f\x00\x85?\x0f\x00\x93?\x0f\x00\xa1?\x0f\x00\xaf?\x0f\x00\xbc?\x0f\x00\xc9?\x0f\x00\xd6?\x0f\x00\xe2?\x0f\x00\xef?\x0f\x00\xfb?\x0f\x00\x07@\x0f\x00\x12@\x0f\x00\x1e@\x0f\x00)@\x0f\x004@\x0f\x00'
@@ -46,51 +35,495 @@ _para_p = \
  [1./(16.*np.pi),    0, 4./3., 1.5], \
  [1./(512.*np.pi),  0, 8./3., 3.0]]
 
+def _rescale_para(para, k):
+    # parameters of f(k x) in the form of _f(x, ...)
+    N, a, b, c = para
+    return [N*k**(-c), a*k**3, b*k**1.5, c]
+
+# the beta = 4 expansions above are in terms of 2**(-1/6) x for the F4 of
+# the tables (mean -2.3069; F4(s) = (det(I - A) + det(I + A))/2 at s sqrt 2)
+_para_n[2] = _rescale_para(_para_n[2], 2.**(-1./6.))
+_para_p[2] = _rescale_para(_para_p[2], 2.**(-1./6.))
+
+# (u, v) matching the asymptotics to the tables at the switch points;
+# precomputed with _find_u_v so that no root finding happens at runtime
+_uv_n = \
+[[0.20744250972411105, -1.5709914976197457], \
+ [0.3871643430387921,  -2.6814934169233253], \
+ [0.514351876267095,   -3.4794673505378473]]
+
+_uv_p = \
+[[0.3314939340013568,  -6.706182153824526], \
+ [-4.720816557769264,  14.66685221995213], \
+ [-0.9437665038356162, 0.2464102234512119]]
+
+# number of elements evaluated at a time, small enough for the temporaries
+# to stay in cache
+_block = 8192
+
+# number of variates drawn and transformed at a time in rvs
+_rvs_block = 65536
+
+# mean, variance, skewness, excess kurtosis, and differential entropy of the
+# exact distributions; mean and variance from Bornemann (2010), Math. Comp.
+# 79, 871, the rest integrated from tables generated with generate_table
+_moments = {
+    1: (-1.2065335745820, 1.6077810345810, 0.2934645241, 0.1652429385, 1.649316534),
+    2: (-1.7710868074116, 0.8131947928329, 0.2240842036, 0.0934480877, 1.311398932),
+    4: (-2.3068848932410, 0.5177237207726, 0.1655094944, 0.0491951565, 1.087507731),
+}
+
+# per-(beta, table) state shared by all TracyWidom instances in this process
+_shared = {}
+
+# format version of the files written by generate_table, the number of
+# header entries in them, the default xlim of the tables, and the smallest
+# cdf or 1 - cdf at the matching points that the quadrature still resolves
+# (its error is about 1e-16 in absolute terms)
+_table_version = 1
+_table_header = 16
+_fredholm_xlim = {1: (-7., 7.), 2: (-6., 4.5), 4: (-6., 2.5)}
+_fredholm_floor = 1.e-12
+
+def _load_table(beta):
+    # the embedded tables: cdf to 6 digits on a 0.01 grid
+    if beta == 1:
+        digits = _digits_1
+        xlim = (-389, 360)
+    elif beta == 2:
+        digits = _digits_2
+        xlim = (-389, 250)
+    elif beta == 4:
+        digits = _digits_4
+        xlim = (-399, 70)
+    x = np.arange(*xlim, dtype=np.int32).astype(float) * 1.e-2
+    y = np.frombuffer(digits, dtype=np.int32).astype(float) * 1.e-6
+    return x, y
+
 def _f (x, N, a, b, c, u=0, v=0):
     s = x**1.5
-    return N*np.exp(-s*(s*a+b))/x**c * (1.+(u+v/s)/s)
+    return N*np.exp(-(s*(s*a+b) if a else s*b))/x**c * (1.+(u+v/s)/s)
+
+def _lnf (x, N, a, b, c, u=0, v=0):
+    # a == 0 is special-cased so that x = inf does not give inf * 0
+    s = x**1.5
+    return np.log(N) - (s*(s*a+b) if a else s*b) - c*np.log(x) \
+            + np.log1p((u+v/s)/s)
 
 def _dlnf_dx(x, N, a, b, c, u=0, v=0):
     s = x**1.5
     return -(3.*a*s*s + 1.5*b*s + c + 1.5*(s*u+v+v)/((s+u)*s+v))/x
 
+def _mdf_dx(x, N, a, b, c, u=0, v=0):
+    # -df/dx
+    f = _f(x, N, a, b, c, u, v)
+    with np.errstate(invalid='ignore'):
+        return np.where(f > 0, -f*_dlnf_dx(x, N, a, b, c, u, v), 0.)
+
+def _lnmdf_dx(x, N, a, b, c, u=0, v=0):
+    # log(-df/dx)
+    with np.errstate(invalid='ignore'):
+        return np.where(np.isinf(x), -np.inf, \
+                _lnf(x, N, a, b, c, u, v) + np.log(-_dlnf_dx(x, N, a, b, c, u, v)))
+
 def _find_u_v (x, f, dlnf, N, a, b, c):
-    #log f = log N - a x^3 - b x^1.5 - c log x + log1p ( (u+v/s)/s )
+    # match f and d log f / dx at x, i.e. with g = 1 + u/s + v/s^2,
+    # g = f / f0 = R and d log g / dx = dlnf - dlnf0 = D,
+    # which are linear in u and v since dg/dx = -1.5 (u/s + 2 v/s^2) / x
     s = x**1.5
-    xd2 = x*2.*(dlnf - _dlnf_dx(x, N, a, b, c))
-    vv = lambda uu : -s*((xd2+3.)*uu + xd2*s)/(xd2+6.)
-    fu = lambda uu : f/_f(x, N, a, b, c, uu, vv(uu)) - 1.
-    for k1, k2 in [(-1, 1), (-5, -3), (715, 725)]:
-        try:
-            u = brentq(fu, k1, k2, disp=False)
-        except ValueError:
-            continue
-        else:
-            break
-    else:
-        raise ValueError("Cannot find u with brentq")
-    v = vv(u)
-    return u, v
+    R = f/_f(x, N, a, b, c)
+    D = dlnf - _dlnf_dx(x, N, a, b, c)
+    w = -x*D*R/1.5 - (R-1.)
+    return float(((R-1.) - w)*s), float(w*s*s)
+
+def _fredholm_dets(s, quad_points=40):
+    # det(I - A_s) and det(I + A_s) on L2(0, inf), A_s(x, y) = Ai(x + y + s),
+    # by Gauss-Legendre quadrature on (0, L) following Bornemann (2010),
+    # Math. Comp. 79, 871; Ai(s + L) is negligible for L = 16 - s
+    from scipy.special import airy
+    t, w = np.polynomial.legendre.leggauss(quad_points)
+    eye = np.eye(quad_points)
+    s = np.asarray(s, dtype=float).reshape(-1)
+    det_m = np.empty_like(s)
+    det_p = np.empty_like(s)
+    for i in range(0, s.size, 256):
+        sb = s[i:i+256, None, None]
+        L = np.maximum(16.-sb, 1.)*0.5
+        x = (t+1.)*L
+        sw = np.sqrt(w*L)
+        K = airy(sb + x + x.swapaxes(1, 2))[0]
+        K *= sw
+        K *= sw.swapaxes(1, 2)
+        det_m[i:i+256] = np.linalg.det(eye - K)
+        det_p[i:i+256] = np.linalg.det(eye + K)
+    return det_m, det_p
+
+def _fredholm_cdf(x, beta, quad_points=40):
+    # Ferrari & Spohn (2005); Bornemann (2010), eqs. (4.5)-(4.7)
+    x = np.asarray(x, dtype=float)
+    if beta == 1:
+        return _fredholm_dets(x, quad_points)[0].reshape(x.shape)
+    elif beta == 2:
+        det_m, det_p = _fredholm_dets(x, quad_points)
+        return (det_m*det_p).reshape(x.shape)
+    elif beta == 4:
+        det_m, det_p = _fredholm_dets(x*np.sqrt(2.), quad_points)
+        return ((det_m+det_p)*0.5).reshape(x.shape)
+    raise ValueError("beta needs to be 1, 2, or 4.")
+
+def _table_path(beta, xlim, dx, quad_points, cache_dir):
+    if cache_dir is None:
+        cache_dir = os.environ.get('TRACYWIDOM_CACHE_DIR', \
+                os.path.join(os.path.expanduser('~'), '.cache', 'TracyWidom'))
+    name = 'tracywidom_v{0}_beta{1}_x{2:.6g}_{3:.6g}_dx{4:.6g}_m{5}.npy'.format(\
+            _table_version, beta, xlim[0], xlim[1], dx, quad_points)
+    return os.path.join(cache_dir, name)
+
+def generate_table(beta=2, xlim=None, dx=0.01, quad_points=40, cache_dir=None):
+    """
+    Generate a cdf table by evaluating the Fredholm determinant
+    representation of the Tracy-Widom distribution, and cache it on disk.
+
+    The file is versioned and holds the spline coefficients and the tail
+    matching parameters, so that TracyWidom(beta, table=path) only needs to
+    memory-map it. An existing file for the same arguments is reused.
+
+    Parameters
+    ----------
+    beta : int, optional
+        1, 2, or 4. Default value is 2.
+    xlim : tuple of two floats, optional
+        First and last grid points. The asymptotics take over beyond the
+        second and second-to-last points. The default range, per beta, ends
+        roughly where cdf or 1 - cdf drops to 1e-9. Both need to stay above
+        1e-12 at the matching points, where the quadrature stops resolving
+        them.
+    dx : float, optional
+        Grid step. Default value is 0.01.
+    quad_points : int, optional
+        Number of Gauss-Legendre points of the quadrature. Default is 40,
+        which gives about machine precision (in absolute terms).
+    cache_dir : str, optional
+        Directory to write the table into. Defaults to the environment
+        variable TRACYWIDOM_CACHE_DIR, or else ~/.cache/TracyWidom.
+
+    Returns
+    -------
+    path : str
+        Path of the table file, to be passed to TracyWidom.
+    """
+    b = int(beta)
+    if b not in (1, 2, 4):
+        raise ValueError("beta needs to be 1, 2, or 4.")
+    if xlim is None:
+        xlim = _fredholm_xlim[b]
+    n = int(round((xlim[1] - xlim[0])/dx)) + 1
+    if n < 5:
+        raise ValueError("xlim needs to span at least 4 steps of dx.")
+    path = _table_path(b, xlim, dx, quad_points, cache_dir)
+    if os.path.isfile(path):
+        return path
+
+    ib = [1, 2, 4].index(b)
+    x = xlim[0] + dx*np.arange(n)
+    y = _fredholm_cdf(x[[1, -2]], b, quad_points)
+    if not (y[0] >= _fredholm_floor and 1. - y[1] >= _fredholm_floor):
+        raise ValueError("xlim reaches too far into the tails: cdf and 1 - cdf "
+                "need to stay above {0:g} at its second and second-to-last "
+                "points.".format(_fredholm_floor))
+    spline = _UniformSpline(x[0], dx, _fredholm_cdf(x, b, quad_points))
+    f, dfdx = spline(x[1]), spline(x[1], nu=1)
+    uv_n = _find_u_v(-x[1], f, -dfdx/f, *_para_n[ib])
+    f, dfdx = 1.-spline(x[-2]), -spline(x[-2], nu=1)
+    uv_p = _find_u_v(x[-2], f, dfdx/f, *_para_p[ib])
+    if not np.all(np.isfinite(uv_n + uv_p)):
+        raise ValueError("Cannot match the tail asymptotics at xlim; "
+                "try a finer dx or more quad_points.")
+
+    header = np.zeros(_table_header)
+    header[:9] = [_table_version, b, x[0], dx, n] + list(uv_n) + list(uv_p)
+    from tempfile import mkstemp
+    d = os.path.dirname(path)
+    os.makedirs(d, exist_ok=True)
+    # write to a temporary file first so that readers never see a partial
+    # table; mkstemp gives each process and thread a name of its own
+    fd, tmp = mkstemp(suffix='.tmp.npy', dir=d)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, np.concatenate([header, spline.coeffs.reshape(-1)]))
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+    return path
+
+def _load_generated_table(path, beta):
+    a = np.load(path, mmap_mode='r')
+    version, b, x0, dx, n = a[:5].tolist()
+    if int(version) != _table_version:
+        raise ValueError("{0} is a version {1} table; need version {2}.".format(\
+                path, int(version), _table_version))
+    if int(b) != beta:
+        raise ValueError("{0} is a table for beta = {1}.".format(path, int(b)))
+    spline = _UniformSpline(x0, dx, coeffs=a[_table_header:].reshape(7, int(n)-1))
+    return spline, a[5:7].tolist(), a[7:9].tolist()
 
 def _finv(y, N, a, b, c, u=0, v=0):
-    # a * x**3 + b*x**1.5 + c * log x + log y - log N
+    # solve log f(x) = log y with Newton's method, starting from the root of
+    # a * x**3 + b * x**1.5 + log y - log N = 0
     ya = np.asanyarray(y)
-    xa = np.ones_like(ya)
+    xa = np.ones(ya.shape)
     flag = (ya>0)
-    logyn = np.log(ya[flag]/N)
+    logy = np.log(ya[flag])
     xa[~flag] = np.inf
-    for i in range(3):
-        ca =  np.log(xa[flag])*c + logyn - np.log1p(u/xa[flag]**1.5 + v/xa[flag]**3)
-        xa[flag] = ((np.sqrt(b*b-4.*a*ca) -b)/(a*2.) if a else ca/(-b))**(2./3.)
+    ca = logy - np.log(N)
+    x = ((np.sqrt(b*b-4.*a*ca) -b)/(a*2.) if a else ca/(-b))**(2./3.)
+    for i in range(4):
+        x -= (_lnf(x, N, a, b, c, u, v) - logy)/_dlnf_dx(x, N, a, b, c, u, v)
+    xa[flag] = x
     return xa
 
+def _n_workers(workers):
+    # number of threads, with negative values counting back from the number
+    # of CPUs as in scipy (-1 for all of them)
+    if workers is None:
+        return 1
+    n = int(workers)
+    if n < 0:
+        n += (os.cpu_count() or 1) + 1
+    if n < 1:
+        raise ValueError("workers needs to be a positive number or -1.")
+    return n
+
+def _clamp_pdf(y):
+    # the 6-digit tables are not quite monotone (beta=2 dips by 2e-5 near
+    # x = 2.455), so the slope of their spline is clamped at zero there;
+    # nan stays nan
+    if isinstance(y, float):
+        return 0. if y < 0. else y
+    return np.maximum(y, 0., out=y)
+
+class _UniformSpline(object):
+    """
+    Not-a-knot cubic spline through y on the uniform grid x0 + dx * arange(n),
+    evaluated by direct index arithmetic into per-interval coefficients.
+    The coefficients may instead be given directly (e.g. memory-mapped), as
+    the (7, n-1) array `coeffs` of a previously built spline.
+    """
+    def __init__(self, x0, dx, y=None, coeffs=None):
+        if coeffs is None:
+            coeffs = self.__solve(np.asarray(y, dtype=float), dx)
+        # rows 0-3: cubic in t = (x - x_i)/dx for y, highest order first;
+        # rows 4-6: the quadratic for dy/dx
+        self.coeffs = coeffs
+        self.x0 = float(x0)
+        self.dx = float(dx)
+        self.n = coeffs.shape[1] + 1
+        self.__coeffs = (tuple(coeffs[:4]), tuple(coeffs[4:]))
+        self.__inv_dx = 1./self.dx
+
+    @staticmethod
+    def __solve(y, dx):
+        n = y.size
+        # second derivatives M: M[i-1] + 4 M[i] + M[i+1] = r[i-1];
+        # not-a-knot gives M[0] = 2 M[1] - M[2], hence 6 M[1] = r[0]
+        r = (y[2:] - 2.*y[1:-1] + y[:-2]) * (6./(dx*dx))
+        M = np.empty(n)
+        M[1] = r[0]/6.
+        M[-2] = r[-1]/6.
+        d = r[1:-1].tolist()
+        d[0] -= M[1]
+        d[-1] -= M[-2]
+        cp = [0.25] * len(d)
+        d[0] *= 0.25
+        for k in range(1, len(d)):
+            cp[k] = 1./(4. - cp[k-1])
+            d[k] = (d[k] - d[k-1]) * cp[k]
+        for k in range(len(d)-2, -1, -1):
+            d[k] -= cp[k] * d[k+1]
+        M[2:-2] = d
+        M[0] = 2.*M[1] - M[2]
+        M[-1] = 2.*M[-2] - M[-3]
+
+        M *= dx*dx/6.
+        c = np.empty((7, n-1))
+        c[0] = (M[1:] - M[:-1])
+        c[1] = M[:-1]*3.
+        c[2] = (y[1:] - y[:-1]) - (M[:-1]*2. + M[1:])
+        c[3] = y[:-1]
+        c[4:] = c[:3] * (np.array([3., 2., 1.])/dx)[:,None]
+        return c
+
+    def __call__(self, x, out=None, nu=0):
+        """
+        Evaluate the spline (nu=0) or its derivative (nu=1) at x.
+        The result has the dtype of `out` if given, or else of x if x is a
+        floating-point array, or else float64. A Python float gives a float.
+        """
+        if out is None and isinstance(x, float):
+            t = (x - self.x0) * self.__inv_dx
+            i = int(min(self.n-2, max(0., t)))
+            t -= i
+            y = 0.
+            for c in self.__coeffs[nu]:
+                y = y*t + float(c[i])
+            return y
+        xa = np.asanyarray(x)
+        if out is None:
+            out = np.empty(xa.shape, xa.dtype if xa.dtype.kind == 'f' else float)
+        t = np.subtract(xa.reshape(-1), self.x0, dtype=float)
+        t *= self.__inv_dx
+        # fmin/fmax map nan to a valid index; t itself keeps the nan
+        i = np.fmin(t, self.n-2)
+        i = np.fmax(i, 0., out=i).astype(np.intp)
+        t -= i
+        coeffs = self.__coeffs[nu]
+        acc = coeffs[0].take(i)
+        tmp = np.empty_like(acc)
+        for c in coeffs[1:]:
+            acc *= t
+            acc += c.take(i, out=tmp)
+        out[...] = acc.reshape(xa.shape)
+        return out
+
+
+class _TailSampler(object):
+    """
+    Draw y >= y0 from the tail density -d/dy f(y) / f(y0), where f(y) is
+    _f(y, *para), by rejection from exp(-(a y**3 + b y**1.5)), whose inverse
+    is the closed-form root that also starts _finv. Each proposal takes a
+    pair of uniforms, so the accepted sequence does not depend on how many
+    variates are asked for at a time.
+    """
+    def __init__(self, y0, para):
+        self.__para = para
+        self.__a, self.__b = para[1], para[2]
+        self.__phi0 = self.__phi(y0)
+        # the density ratio decreases with y for all the tails here, so the
+        # bound is its value at y0; the max over a grid is only a safeguard
+        y = y0 + np.r_[0., np.logspace(-6., 3., 201)]
+        self.__ln_m = self.__ln_ratio(y, self.__phi(y)).max()
+
+    def __phi(self, y):
+        return self.__a*y**3 + self.__b*y**1.5
+
+    def __ln_ratio(self, y, phi):
+        dphi = 3.*self.__a*y*y + 1.5*self.__b*np.sqrt(y)
+        return _lnmdf_dx(y, *self.__para) + phi - np.log(dphi)
+
+    def __call__(self, n, rng):
+        a, b = self.__a, self.__b
+        out = np.empty(n)
+        i = 0
+        while i < n:
+            u = rng.random((n-i, 2))
+            phi = self.__phi0 - np.log1p(-u[:,0])
+            s = phi/b if a == 0 else (np.sqrt(b*b + 4.*a*phi) - b)/(2.*a)
+            y = s**(2./3.)
+            y = y[u[:,1] < np.exp(self.__ln_ratio(y, phi) - self.__ln_m)]
+            out[i:i+y.size] = y
+            i += y.size
+        return out
+
+
+class _MonotoneInverse(object):
+    """
+    Monotone cubic Hermite interpolant of x as a function of y = F(x), given
+    F on an increasing grid x and its derivative dF/dx, so that dx/dy = 1/F'.
+    Slopes are limited (Fritsch & Carlson 1980) to keep the result monotone.
+    """
+    def __init__(self, x, y, dydx):
+        x = np.asarray(x, dtype=float)
+        y = np.maximum.accumulate(np.asarray(y, dtype=float))
+        dydx = np.asarray(dydx, dtype=float)
+        keep = np.r_[True, np.diff(y) > 0]
+        x, y, dydx = x[keep], y[keep], dydx[keep]
+
+        m = np.zeros_like(dydx)
+        np.divide(1., dydx, out=m, where=(dydx > 0))
+        h = np.diff(y)
+        dx = np.diff(x)
+        r = (m[:-1]**2 + m[1:]**2) * (h/dx)**2
+        tau = np.ones_like(r)
+        np.divide(3., np.sqrt(r), out=tau, where=(r > 9.))
+        m *= np.minimum(np.r_[tau, 1.], np.r_[1., tau])
+
+        # x = ((c0*t + c1)*t + c2)*t + c3 with t = (y - y_k)/(y_{k+1} - y_k)
+        hm0 = h*m[:-1]
+        hm1 = h*m[1:]
+        c = np.array([hm0 + hm1 - 2.*dx, 3.*dx - 2.*hm0 - hm1, hm0, x[:-1]])
+        self.__coeffs = tuple(c)
+        self.__coeffs_list = [cc.tolist() for cc in c]
+        self.__y = y
+        self.__y_list = y.tolist()
+        self.__inv_h = 1./h
+        self.__inv_h_list = self.__inv_h.tolist()
+        self.__n = y.size
+
+        # guide table: the first interval of each bin of a uniform grid in
+        # z = log(y/(1-y)), in which the knots are close to evenly spaced,
+        # so that the lookup is O(1) instead of a binary search
+        z = np.clip(y, 1.e-300, 1.-2.**-53)
+        z = np.log(z/(1.-z))
+        m = 2*self.__n
+        self.__z0 = z[0]
+        self.__inv_hz = m/(z[-1] - z[0])
+        guide = z.searchsorted(z[0] + np.arange(m+1)/self.__inv_hz, side='right')
+        guide -= 1
+        np.clip(guide, 0, self.__n-2, out=guide)
+        self.__guide = guide
+        self.__m = m
+        # number of steps forward needed at most within a bin
+        self.__steps = int(np.diff(guide).max())
+
+    def __call__(self, y, out=None):
+        """
+        Evaluate the inverse at y, in the same way as _UniformSpline.
+        """
+        if out is None and isinstance(y, float):
+            k = min(max(bisect_right(self.__y_list, y) - 1, 0), self.__n-2)
+            t = (y - self.__y_list[k]) * self.__inv_h_list[k]
+            x = 0.
+            for c in self.__coeffs_list:
+                x = x*t + c[k]
+            return x
+        ya = np.asanyarray(y)
+        if out is None:
+            out = np.empty(ya.shape, ya.dtype if ya.dtype.kind == 'f' else float)
+        yf = ya.reshape(-1)
+        y = self.__y
+        t = np.subtract(1., yf, dtype=float)
+        np.divide(yf, t, out=t)
+        np.log(t, out=t)
+        t -= self.__z0
+        t *= self.__inv_hz
+        # fmin/fmax map nan to a valid bin
+        j = np.fmin(t, self.__m-1)
+        k = self.__guide.take(np.fmax(j, 0., out=j).astype(np.intp))
+        for i in range(self.__steps):
+            k += (yf >= y.take(k+1))
+            np.minimum(k, self.__n-2, out=k)
+        # one step back for the rounding of z at the bin edges
+        k -= (yf < y.take(k))
+        np.maximum(k, 0, out=k)
+        t = np.subtract(yf, y.take(k), dtype=float)
+        t *= self.__inv_h.take(k)
+        acc = self.__coeffs[0].take(k)
+        tmp = np.empty_like(acc)
+        for c in self.__coeffs[1:]:
+            acc *= t
+            acc += c.take(k, out=tmp)
+        out[...] = acc.reshape(ya.shape)
+        return out
+
+
 class TracyWidom(object):
     """
     Provide the Tracy-Widom distribution functions for beta = 1, 2, or 4.
     We use the tables in http://www.cl.cam.ac.uk/~aib29/TWinSplus.pdf
     and the asymptotics in http://arxiv.org/abs/1111.2761
     """
-    def __init__(self, beta=2):
+    def __init__(self, beta=2, table=None):
         """
         Construnct a TracyWidom class for a given beta.
 
@@ -100,52 +533,73 @@ class TracyWidom(object):
             The beta value of the Tracy-Widom distribution.
             Can only be 1, 2, or 4; otherwise a ValueError will raise.
             Default value is 2.
+        table : str, optional
+            Path of a table file written by generate_table, which is
+            memory-mapped instead of using the embedded 6-digit tables.
 
         Returns
         -------
         A TracyWidom class instance with member functions cdf, pdf, and cdfinv.
+
+        Notes
+        -----
+        The tables are built only once per beta (and table) in each process;
+        later instances with the same beta share them and are cheap to
+        construct.
         """
         b = int(beta)
-        if b == 1:
-            digits = _digits_1
-            xlim = (-389, 360)
-        elif b == 2:
-            digits = _digits_2
-            xlim = (-389, 250)
-        elif b == 4:
-            digits = _digits_4
-            xlim = (-399, 70)
-        else:
+        if b not in (1, 2, 4):
             raise ValueError("beta needs to be 1, 2, or 4.")
+        if table is not None:
+            table = os.path.abspath(table)
+        if (b, table) not in _shared:
+            self.__setup(b, table)
+            _shared[(b, table)] = self.__dict__.copy()
+        self.__dict__.update(_shared[(b, table)])
 
+    def __setup(self, b, table):
         self.beta = b
         ib = [1, 2, 4].index(b)
 
-        x = np.arange(*xlim, dtype=np.int32).astype(float) * 1.e-2
-        y = np.frombuffer(digits, dtype=np.int32).astype(float) * 1.e-6
-        self.__xlim = (x[1], x[-2])
-        self.__cdf    = interp1d(x, y, kind='cubic', bounds_error=False)
+        if table is None:
+            x, y = _load_table(b)
+            self.__spline = _UniformSpline(x[0], 1.e-2, y)
+            uv_n, uv_p = _uv_n[ib], _uv_p[ib]
+        else:
+            self.__spline, uv_n, uv_p = _load_generated_table(table, b)
+        sp = self.__spline
+        self.__xlim = (sp.x0 + sp.dx, sp.x0 + (sp.n-2)*sp.dx)
+        self.__cdf = lambda xx, out: self.__spline(xx, out)
+        self.__pdf = lambda xx, out: _clamp_pdf(self.__spline(xx, out, nu=1))
 
-        dlnf = derivative(lambda xx: np.log(self.__cdf(-xx)), -x[1], \
-                dx=3.33e-3, order=7)
-        self.__para_n = _para_n[ib] \
-                + list(_find_u_v(-x[1], y[1], dlnf, *_para_n[ib]))
+        self.__para_n = _para_n[ib] + list(uv_n)
         self.__asym_n = lambda xx: _f(-xx, *self.__para_n)
+        self.__asym_pdf_n = lambda xx: _mdf_dx(-xx, *self.__para_n)
         self.__asym_inv_n = lambda yy: -(_finv(yy, *self.__para_n))
 
-        dlnf = derivative(lambda xx: np.log(1.-self.__cdf(xx)), x[-2], \
-                dx=3.33e-3, order=7)
-        self.__para_p = _para_p[ib] + list(_find_u_v(x[-2], 1.-y[-2], dlnf, \
-                *_para_p[ib]))
+        self.__para_p = _para_p[ib] + list(uv_p)
         self.__asym_p = lambda xx: 1.-_f(xx, *self.__para_p)
+        self.__asym_pdf_p = lambda xx: _mdf_dx(xx, *self.__para_p)
         self.__asym_inv_p = lambda yy: _finv(1.-yy, *self.__para_p)
 
-        x = np.linspace(-8, 4, 2401)
+        # the inverse table covers at least [-8, 4], and all of the table so
+        # that cdfinv only uses the asymptotics where cdf does
+        x_n, x_p = min(-8., self.__xlim[0]), max(4., self.__xlim[1])
+        x = np.linspace(x_n, x_p, int(round((x_p - x_n)/0.005)) + 1)
         y = self.cdf(x)
         self.__ylim = (y[0], y[-1])
-        self.__cdfinv = interp1d(self.cdf(x), x, bounds_error=False)
+        # the 6-digit tables are not quite monotone where cdf is close to 1;
+        # _MonotoneInverse drops the points that would break monotonicity
+        self.__inverse = _MonotoneInverse(x, y, self.pdf(x))
 
-    def cdf(self, x):
+        # beyond these, rvs samples the asymptotic tails by rejection
+        # instead of inverting them with Newton's method; the samplers are
+        # built on the first tail draw, in a list shared by all instances
+        self.__rvs_lim = (float(y[0]), float(y[-1]))
+        self.__tails = [(-x_n, self.__para_n), (x_p, self.__para_p)]
+        self.__cdfinv = lambda yy, out: self.__inverse(yy, out)
+
+    def cdf(self, x, out=None, chunk_size=None, workers=None):
         """
         Return the cumulative distribution function at x.
         cdf(x) = P(TW < x)
@@ -153,23 +607,25 @@ class TracyWidom(object):
         Parameters
         ----------
         x : float or array-like
+        out : ndarray, optional
+            Array of the same shape as x to write the result into.
+        chunk_size : int, optional
+            Number of elements evaluated at a time, which bounds the memory
+            used for temporaries. Default value is 8192.
+        workers : int, optional
+            Number of threads evaluating the chunks in parallel; negative
+            values count back from the number of CPUs (-1 for all of them).
+            Default value is 1.
 
         Returns
         -------
         y : float or array-like
             y = cdf(x)
         """
-        xa = np.asanyarray(x)
-        scalar = (xa.ndim==0)
-        if scalar: xa = xa.flatten()
-        y = self.__cdf(xa)
-        flag = xa < self.__xlim[0]
-        y[flag] = self.__asym_n(xa[flag])
-        flag = xa > self.__xlim[1]
-        y[flag] = self.__asym_p(xa[flag])
-        return y[0] if scalar else y
+        return self.__piecewise(x, out, self.__cdf, \
+                self.__asym_n, self.__asym_p, chunk_size=chunk_size, workers=workers)
 
-    def pdf(self, x):
+    def pdf(self, x, out=None, chunk_size=None, workers=None):
         """
         Return the probability distribution function at x.
         pdf(x) = d P(TW < x) / dx.
@@ -177,16 +633,25 @@ class TracyWidom(object):
         Parameters
         ----------
         x : float or array-like
+        out : ndarray, optional
+            Array of the same shape as x to write the result into.
+        chunk_size : int, optional
+            Number of elements evaluated at a time, which bounds the memory
+            used for temporaries. Default value is 8192.
+        workers : int, optional
+            Number of threads evaluating the chunks in parallel; negative
+            values count back from the number of CPUs (-1 for all of them).
+            Default value is 1.
 
         Returns
         -------
         y : float or array-like
             y = pdf(x)
         """
-        xa = np.asanyarray(x)
-        return derivative(self.cdf, xa, dx=0.08, order=5)
+        return self.__piecewise(x, out, self.__pdf, \
+                self.__asym_pdf_n, self.__asym_pdf_p, chunk_size=chunk_size, workers=workers)
 
-    def cdfinv(self, x):
+    def cdfinv(self, x, out=None, tol=None, chunk_size=None, workers=None):
         """
         Return the inverse cumulative distribution function at x.
         cdfinv(x) = cdf^{-1}(x)
@@ -195,18 +660,545 @@ class TracyWidom(object):
         ----------
         x : float or array-like
             Only values in (0, 1) are valid.
+        out : ndarray, optional
+            Array of the same shape as x to write the result into.
+            It may be x itself.
+        tol : float, optional
+            If None (default), use the monotone cubic inverse table, which
+            is accurate to about 1e-6 and needs no iteration.
+            Otherwise, polish that with Newton's method on cdf until the
+            step is below tol (at most 8 iterations per element); this
+            inverts cdf itself to tol, not the exact distribution.
+        chunk_size : int, optional
+            Number of elements evaluated at a time, which bounds the memory
+            used for temporaries. Default value is 8192.
+        workers : int, optional
+            Number of threads evaluating the chunks in parallel; negative
+            values count back from the number of CPUs (-1 for all of them).
+            Default value is 1.
 
         Returns
         -------
         y : float or array-like
             y = cdfinv(x)
         """
+        if tol is None:
+            func = self.__cdfinv
+        else:
+            func = lambda xx, o: self.__cdfinv_newton(xx, o, tol)
+        return self.__piecewise(x, out, func, \
+                self.__asym_inv_n, self.__asym_inv_p, self.__ylim, \
+                chunk_size=chunk_size, workers=workers)
+
+    def __cdfinv_newton(self, q, out, tol):
+        if out is None:
+            x = self.__cdfinv(q, None)
+            for i in range(8):
+                p = self.pdf(x)
+                if not p > 0: break
+                dx = (self.cdf(x) - q)/p
+                x -= dx
+                if abs(dx) < tol: break
+            return x
+        x = self.__cdfinv(q, None)
+        idx = np.flatnonzero((q >= self.__ylim[0]) & (q <= self.__ylim[1]))
+        xs = x[idx]
+        qs = q[idx]
+        for i in range(8):
+            p = self.pdf(xs)
+            dx = self.cdf(xs)
+            dx -= qs
+            np.divide(dx, p, out=dx, where=(p > 0))
+            dx[~(p > 0)] = 0.
+            xs -= dx
+            x[idx] = xs
+            # only keep iterating on the elements that have not converged
+            flag = np.abs(dx) >= tol
+            if not flag.any(): break
+            idx = idx[flag]
+            xs = xs[flag]
+            qs = qs[flag]
+        out[...] = x
+        return out
+
+    def sf(self, x, out=None, chunk_size=None, workers=None):
+        """
+        Return the survival function at x.
+        sf(x) = P(TW > x) = 1 - cdf(x)
+
+        In the right tail this is evaluated directly from the asymptotics,
+        so it does not cancel to 0 where cdf(x) rounds to 1.
+
+        Parameters
+        ----------
+        x : float or array-like
+        out : ndarray, optional
+            Array of the same shape as x to write the result into.
+        chunk_size : int, optional
+            Number of elements evaluated at a time, which bounds the memory
+            used for temporaries. Default value is 8192.
+        workers : int, optional
+            Number of threads evaluating the chunks in parallel; negative
+            values count back from the number of CPUs (-1 for all of them).
+            Default value is 1.
+
+        Returns
+        -------
+        y : float or array-like
+            y = sf(x)
+        """
+        pn, pp = self.__para_n, self.__para_p
+        return self.__piecewise(x, out, \
+                lambda xx, o: np.subtract(1., self.__cdf(xx, o), out=o), \
+                lambda xx: 1.-_f(-xx, *pn), lambda xx: _f(xx, *pp), \
+                chunk_size=chunk_size, workers=workers)
+
+    def logcdf(self, x, out=None, chunk_size=None, workers=None):
+        """
+        Return the log of the cumulative distribution function at x.
+        logcdf(x) = log P(TW < x)
+
+        Parameters
+        ----------
+        x : float or array-like
+        out : ndarray, optional
+            Array of the same shape as x to write the result into.
+        chunk_size : int, optional
+            Number of elements evaluated at a time, which bounds the memory
+            used for temporaries. Default value is 8192.
+        workers : int, optional
+            Number of threads evaluating the chunks in parallel; negative
+            values count back from the number of CPUs (-1 for all of them).
+            Default value is 1.
+
+        Returns
+        -------
+        y : float or array-like
+            y = logcdf(x)
+        """
+        pn, pp = self.__para_n, self.__para_p
+        return self.__piecewise(x, out, \
+                lambda xx, o: np.log(self.__cdf(xx, o), out=o), \
+                lambda xx: _lnf(-xx, *pn), lambda xx: np.log1p(-_f(xx, *pp)), \
+                chunk_size=chunk_size, workers=workers)
+
+    def logsf(self, x, out=None, chunk_size=None, workers=None):
+        """
+        Return the log of the survival function at x.
+        logsf(x) = log P(TW > x)
+
+        Parameters
+        ----------
+        x : float or array-like
+        out : ndarray, optional
+            Array of the same shape as x to write the result into.
+        chunk_size : int, optional
+            Number of elements evaluated at a time, which bounds the memory
+            used for temporaries. Default value is 8192.
+        workers : int, optional
+            Number of threads evaluating the chunks in parallel; negative
+            values count back from the number of CPUs (-1 for all of them).
+            Default value is 1.
+
+        Returns
+        -------
+        y : float or array-like
+            y = logsf(x)
+        """
+        pn, pp = self.__para_n, self.__para_p
+        return self.__piecewise(x, out, \
+                lambda xx, o: np.log1p(np.negative(self.__cdf(xx, o), out=o), out=o), \
+                lambda xx: np.log1p(-_f(-xx, *pn)), lambda xx: _lnf(xx, *pp), \
+                chunk_size=chunk_size, workers=workers)
+
+    def logpdf(self, x, out=None, chunk_size=None, workers=None):
+        """
+        Return the log of the probability distribution function at x.
+
+        Parameters
+        ----------
+        x : float or array-like
+        out : ndarray, optional
+            Array of the same shape as x to write the result into.
+        chunk_size : int, optional
+            Number of elements evaluated at a time, which bounds the memory
+            used for temporaries. Default value is 8192.
+        workers : int, optional
+            Number of threads evaluating the chunks in parallel; negative
+            values count back from the number of CPUs (-1 for all of them).
+            Default value is 1.
+
+        Returns
+        -------
+        y : float or array-like
+            y = logpdf(x)
+        """
+        pn, pp = self.__para_n, self.__para_p
+        def body(xx, o):
+            y = self.__pdf(xx, o)
+            # scalars skip errstate, so where the clamped pdf is zero
+            if isinstance(y, float) and y == 0.:
+                return -np.inf
+            return np.log(y, out=o)
+        return self.__piecewise(x, out, body, \
+                lambda xx: _lnmdf_dx(-xx, *pn), lambda xx: _lnmdf_dx(xx, *pp), \
+                chunk_size=chunk_size, workers=workers)
+
+    def __piecewise(self, x, out, func, asym_n, asym_p, lim=None, \
+            chunk_size=None, workers=None):
+        # evaluate func(x, out) chunk by chunk, with the two tails replaced
+        # by the asymptotics; the tails are computed before func runs so
+        # that out may be x itself
+        if lim is None: lim = self.__xlim
         xa = np.asanyarray(x)
-        scalar = (xa.ndim==0)
-        if scalar: xa = xa.flatten()
-        y = self.__cdfinv(xa)
-        flag = xa < self.__ylim[0]
-        y[flag] = self.__asym_inv_n(xa[flag])
-        flag = xa > self.__ylim[1]
-        y[flag] = self.__asym_inv_p(xa[flag])
-        return y[0] if scalar else y
+        if out is None and xa.ndim == 0:
+            dtype = xa.dtype if xa.dtype.kind == 'f' else np.dtype(float)
+            xs = float(xa)
+            # errstate costs more than the table lookup, so only the tails,
+            # which go through numpy, get it
+            if xs < lim[0]:
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    y = asym_n(xs)
+            elif xs > lim[1]:
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    y = asym_p(xs)
+            else:
+                y = func(xs, None)
+            return dtype.type(y)
+        if out is None:
+            out = np.empty(xa.shape, xa.dtype if xa.dtype.kind == 'f' else float)
+        elif out.shape != xa.shape:
+            raise ValueError("out needs to have the same shape as x.")
+        chunk_size = _block if chunk_size is None else int(chunk_size)
+        if chunk_size < 1:
+            raise ValueError("chunk_size needs to be positive.")
+        workers = _n_workers(workers)
+
+        # non-contiguous arrays go through .flat one chunk at a time, so
+        # that no full-size copy of x or out is ever made
+        xf = xa.reshape(-1) if xa.flags.c_contiguous else None
+        of = out.reshape(-1) if out.flags.c_contiguous else None
+
+        def run(start, stop):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                for i in range(start, stop, chunk_size):
+                    k = min(i + chunk_size, stop)
+                    xb = xa.flat[i:k] if xf is None else xf[i:k]
+                    ob = np.empty(k - i, out.dtype) if of is None else of[i:k]
+                    flag_n = flag_p = None
+                    if np.fmin.reduce(xb) < lim[0]:
+                        flag_n = xb < lim[0]
+                        y_n = asym_n(xb[flag_n])
+                    if np.fmax.reduce(xb) > lim[1]:
+                        flag_p = xb > lim[1]
+                        y_p = asym_p(xb[flag_p])
+                    func(xb, ob)
+                    if flag_n is not None: ob[flag_n] = y_n
+                    if flag_p is not None: ob[flag_p] = y_p
+                    if of is None: out.flat[i:k] = ob
+
+        n = out.size
+        if workers == 1 or n <= chunk_size:
+            run(0, n)
+        else:
+            # NumPy releases the GIL in the ufuncs, so threads scale; a few
+            # spans per thread even out the load between the tails and the
+            # table
+            from concurrent.futures import ThreadPoolExecutor
+            span = -(-n // (workers*4))
+            span = -(-span // chunk_size) * chunk_size
+            with ThreadPoolExecutor(workers) as executor:
+                tasks = [executor.submit(run, i, min(i + span, n)) \
+                        for i in range(0, n, span)]
+                for task in tasks:
+                    task.result()
+        return out[()] if out.ndim == 0 else out
+
+    def rvs(self, size=None, random_state=None, out=None):
+        """
+        Draw random variates from the Tracy-Widom distribution.
+
+        The bulk is drawn by inverting cdf with the inverse table; beyond
+        x = -8 and 4 (or the ends of the table), the asymptotic tails are
+        sampled by rejection, each from a stream of its own.
+
+        Parameters
+        ----------
+        size : int or tuple of ints, optional
+            Output shape. Ignored if `out` is given.
+            If both are None, a single float is returned.
+        random_state : None, int, or numpy.random.Generator, optional
+            Passed to numpy.random.default_rng.
+        out : ndarray, optional
+            C-contiguous float64 or float32 array to fill in place.
+
+        Returns
+        -------
+        r : float or ndarray
+            The random variates (`out` itself if given).
+        """
+        rng = np.random.default_rng(random_state)
+        streams = self.__tail_streams(rng)
+        if out is None and size is None:
+            r = rng.random()
+            if r < self.__rvs_lim[0]:
+                return -self.__tail_draw(0, 1, streams)[0]
+            if r > self.__rvs_lim[1]:
+                return self.__tail_draw(1, 1, streams)[0]
+            return self.cdfinv(r)
+        if out is None:
+            out = np.empty(size)
+        elif not out.flags.c_contiguous:
+            raise ValueError("out needs to be C-contiguous.")
+
+        self.__rvs(out.reshape(-1), rng, streams)
+        return out
+
+    @staticmethod
+    def __tail_streams(rng):
+        # each tail gets a stream of its own, seeded before any uniform is
+        # drawn, so that chunking does not change the variates; the
+        # generators are only built once a tail draw occurs
+        return rng.bit_generator.random_raw(2).tolist()
+
+    def __tail_draw(self, k, n, streams):
+        if not isinstance(self.__tails[k], _TailSampler):
+            self.__tails[k] = _TailSampler(*self.__tails[k])
+        if not isinstance(streams[k], np.random.Generator):
+            streams[k] = np.random.default_rng(streams[k])
+        return self.__tails[k](n, streams[k])
+
+    def __rvs(self, flat, rng, streams):
+        lim = self.__rvs_lim
+        for i in range(0, flat.size, _rvs_block):
+            r = flat[i:i+_rvs_block]
+            rng.random(out=r, dtype=r.dtype)
+            flag_n = flag_p = None
+            if r.min() < lim[0]:
+                flag_n = np.flatnonzero(r < lim[0])
+                r[flag_n] = 0.5
+            if r.max() > lim[1]:
+                flag_p = np.flatnonzero(r > lim[1])
+                r[flag_p] = 0.5
+            self.cdfinv(r, out=r)
+            if flag_n is not None:
+                r[flag_n] = -self.__tail_draw(0, flag_n.size, streams)
+            if flag_p is not None:
+                r[flag_p] = self.__tail_draw(1, flag_p.size, streams)
+        return flat
+
+    def rvs_chunks(self, size, chunk_size=_rvs_block, random_state=None):
+        """
+        Draw `size` random variates in chunks of at most `chunk_size`.
+
+        Parameters
+        ----------
+        size : int
+            Total number of variates.
+        chunk_size : int, optional
+            Largest number of variates per chunk. Default value is 65536.
+        random_state : None, int, or numpy.random.Generator, optional
+            Passed to numpy.random.default_rng.
+
+        Yields
+        ------
+        r : ndarray
+            The next chunk of variates. The same buffer is reused for
+            every chunk; copy it if it needs to outlive the iteration.
+        """
+        size, chunk_size = int(size), int(chunk_size)
+        if size < 0:
+            raise ValueError("size needs to be non-negative.")
+        if chunk_size < 1:
+            raise ValueError("chunk_size needs to be positive.")
+        rng = np.random.default_rng(random_state)
+        streams = self.__tail_streams(rng)
+
+        def chunks(size):
+            buf = np.empty(min(size, chunk_size))
+            while size > 0:
+                n = min(size, buf.size)
+                yield self.__rvs(buf[:n], rng, streams)
+                size -= n
+        return chunks(size)
+
+
+def wishart_scaling(n, p, beta=1):
+    """
+    Return the centering and scaling constants of the largest eigenvalue of
+    a white Wishart matrix X^T X, where X is n-by-p with independent
+    standard normal entries (real for beta = 1, complex for beta = 2).
+    (l - mu) / sigma converges to the Tracy-Widom distribution of that beta.
+
+    Parameters
+    ----------
+    n : int or array-like
+        Number of samples (rows of X).
+    p : int or array-like
+        Number of variables (columns of X).
+    beta : int, optional
+        1 (real) or 2 (complex). Default value is 1.
+
+    Returns
+    -------
+    mu, sigma : float or ndarray
+        Johnstone (2001) constants for beta = 1, which use n - 1 in place
+        of n; Johansson (2000) constants for beta = 2.
+    """
+    b = int(beta)
+    if b not in (1, 2):
+        raise ValueError("beta needs to be 1 or 2.")
+    n = np.asarray(n, dtype=float)
+    p = np.asarray(p, dtype=float)
+    if b == 1:
+        n = n - 1.
+    if not np.all(n > 0):
+        raise ValueError("n needs to be at least {0}.".format(2 if b == 1 else 1))
+    if not np.all(p > 0):
+        raise ValueError("p needs to be positive.")
+    sn = np.sqrt(n)
+    sp = np.sqrt(p)
+    mu = (sn + sp)**2
+    sigma = (sn + sp) * np.cbrt(1./sn + 1./sp)
+    return mu[()], sigma[()]
+
+def largest_eigenvalue_pvalue(eigs, n, p, beta=1):
+    """
+    Return the p-values of the largest eigenvalues of white Wishart
+    matrices, i.e. P(TW > (l - mu) / sigma) with the constants of
+    wishart_scaling, for any number of matrices at once.
+
+    Parameters
+    ----------
+    eigs : float or array-like
+        Largest eigenvalue of X^T X for each matrix, where X is n-by-p with
+        unit-variance entries (n times that of the sample covariance).
+    n, p : int or array-like
+        Dimensions of X; broadcast against eigs.
+    beta : int, optional
+        1 (real) or 2 (complex). Default value is 1.
+
+    Returns
+    -------
+    pvalue : float or ndarray
+        Evaluated with sf, so small p-values keep their relative accuracy.
+    """
+    mu, sigma = wishart_scaling(n, p, beta)
+    s = np.subtract(eigs, mu, dtype=float)
+    s /= sigma
+    return TracyWidom(beta).sf(s)
+
+def kth_eigenvalue_pvalue(eigs, n, p, k, beta=1):
+    """
+    Return the p-values of the k-th largest eigenvalues of Wishart
+    matrices, for the sequential test of whether there are fewer than k
+    signal components (Kritchman & Nadler 2009): with the k - 1 larger
+    eigenvalues taken as signal, the k-th is the largest of the p - k + 1
+    noise eigenvalues and is scaled with wishart_scaling(n, p - k + 1).
+
+    Parameters
+    ----------
+    eigs : float or array-like
+        k-th largest eigenvalue of X^T X for each matrix, as in
+        largest_eigenvalue_pvalue.
+    n, p : int or array-like
+        Dimensions of X.
+    k : int or array-like
+        Rank of the eigenvalue, 1 for the largest. Must be at most p.
+    beta : int, optional
+        1 (real) or 2 (complex). Default value is 1.
+
+    Returns
+    -------
+    pvalue : float or ndarray
+        All of eigs, n, p, and k are broadcast against each other.
+    """
+    p_noise = np.subtract(p, k) + 1
+    if not (np.all(np.asarray(k) >= 1) and np.all(p_noise >= 1)):
+        raise ValueError("k needs to be between 1 and p.")
+    return largest_eigenvalue_pvalue(eigs, n, p_noise, beta)
+
+
+def _make_tracywidom_gen():
+    from scipy.stats import rv_continuous
+
+    class tracywidom_gen(rv_continuous):
+        """
+        The Tracy-Widom distribution as a scipy.stats continuous random
+        variable, for beta = 1, 2, or 4 (default 2):
+
+            tw1 = tracywidom_gen(beta=1)
+            tw1.ppf(0.95), tw1.fit(data)
+
+        cdf, sf, pdf, their logs, ppf, and rvs use the vectorized paths of
+        TracyWidom, and the moments and entropy are precomputed, so none of
+        them (nor fitting loc and scale) goes through numerical integration
+        or root finding.
+        """
+        def __init__(self, beta=2, **kwargs):
+            self.__tw = TracyWidom(beta)
+            self.beta = self.__tw.beta
+            kwargs.setdefault('name', 'tracywidom{0}'.format(self.beta))
+            rv_continuous.__init__(self, **kwargs)
+
+        def _updated_ctor_param(self):
+            dct = rv_continuous._updated_ctor_param(self)
+            dct['beta'] = self.beta
+            return dct
+
+        def __getstate__(self):
+            # TracyWidom instances hold lambdas; rebuild from the shared state
+            dct = rv_continuous.__getstate__(self)
+            del dct['_tracywidom_gen__tw']
+            return dct
+
+        def __setstate__(self, state):
+            rv_continuous.__setstate__(self, state)
+            self.__tw = TracyWidom(self.beta)
+
+        def _cdf(self, x):
+            return self.__tw.cdf(x)
+
+        def _sf(self, x):
+            return self.__tw.sf(x)
+
+        def _logcdf(self, x):
+            return self.__tw.logcdf(x)
+
+        def _logsf(self, x):
+            return self.__tw.logsf(x)
+
+        def _pdf(self, x):
+            return self.__tw.pdf(x)
+
+        def _logpdf(self, x):
+            return self.__tw.logpdf(x)
+
+        def _ppf(self, q):
+            return self.__tw.cdfinv(q)
+
+        def _rvs(self, size=None, random_state=None):
+            # random_state may be a RandomState as well as a Generator
+            u = random_state.uniform(size=size)
+            if isinstance(u, np.ndarray):
+                return self.__tw.cdfinv(u, out=u)
+            return self.__tw.cdfinv(u)
+
+        def _stats(self):
+            return _moments[self.beta][:4]
+
+        def _entropy(self):
+            return _moments[self.beta][4]
+
+    # so that pickle finds the class through __getattr__ below
+    tracywidom_gen.__module__ = __name__
+    tracywidom_gen.__qualname__ = 'tracywidom_gen'
+    return tracywidom_gen
+
+def __getattr__(name):
+    # tracywidom_gen is only built on first access, so that importing this
+    # module does not import scipy.stats
+    if name == 'tracywidom_gen':
+        globals()[name] = _make_tracywidom_gen()
+        return globals()[name]
+    raise AttributeError("module {0!r} has no attribute {1!r}".format(__name__, name))
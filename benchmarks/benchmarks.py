@@ -0,0 +1,155 @@
+"""
+Benchmarks for TracyWidom, in the airspeed velocity (asv) format.
+Run with `asv run` from the repository root; see asv.conf.json.
+Accuracy is covered by test_accuracy.py and test_main.py.
+"""
+
+import numpy as np
+import TracyWidom as tw_module
+from TracyWidom import TracyWidom
+
+_betas = [1, 2, 4]
+_sizes = [1, 10, 1000, 100000, 10000000, 100000000]
+
+
+class Import:
+    def timeraw_import(self):
+        return "import TracyWidom"
+
+    def timeraw_first_cdf(self):
+        return "TracyWidom.TracyWidom(2).cdf(0.)", "import TracyWidom"
+
+
+class Construction:
+    params = _betas
+    param_names = ['beta']
+    number = 1
+    repeat = 10
+
+    def setup(self, beta):
+        tw_module._shared.clear()
+
+    def time_build(self, beta):
+        TracyWidom(beta)
+
+    def peakmem_build(self, beta):
+        TracyWidom(beta)
+
+
+class SharedConstruction:
+    params = _betas
+    param_names = ['beta']
+
+    def setup(self, beta):
+        tw_module._shared.clear()
+        TracyWidom(beta)
+
+    def time_shared(self, beta):
+        TracyWidom(beta)
+
+
+class Evaluate:
+    params = (['cdf', 'pdf', 'sf', 'logcdf', 'logsf', 'logpdf', 'cdfinv'], _sizes)
+    param_names = ['method', 'size']
+    timeout = 600
+
+    def setup(self, method, size):
+        tw = TracyWidom(2)
+        self.func = getattr(tw, method)
+        rng = np.random.default_rng(0)
+        if method == 'cdfinv':
+            x = rng.random(size)
+        else:
+            x = rng.normal(-1.77, 1.5, size)
+        self.x = float(x[0]) if size == 1 else x
+
+    def time_eval(self, method, size):
+        self.func(self.x)
+
+    def peakmem_eval(self, method, size):
+        self.func(self.x)
+
+
+class Sample:
+    params = _sizes
+    param_names = ['size']
+    timeout = 600
+
+    def setup(self, size):
+        self.tw = TracyWidom(2)
+        self.out = np.empty(size)
+
+    def time_rvs(self, size):
+        self.tw.rvs(random_state=0, out=self.out)
+
+    def peakmem_rvs_chunks(self, size):
+        for _ in self.tw.rvs_chunks(size, random_state=0):
+            pass
+
+
+class CdfinvPrecise:
+    params = ([None, 1.e-8, 1.e-12], _sizes[:-1])
+    param_names = ['tol', 'size']
+    timeout = 600
+
+    def setup(self, tol, size):
+        self.tw = TracyWidom(2)
+        q = np.random.default_rng(0).random(size)
+        self.q = float(q[0]) if size == 1 else q
+
+    def time_cdfinv(self, tol, size):
+        self.tw.cdfinv(self.q, tol=tol)
+
+
+class Parallel:
+    params = (['cdf', 'pdf', 'cdfinv'], [1, 2, 4, -1])
+    param_names = ['method', 'workers']
+    timeout = 600
+
+    def setup(self, method, workers):
+        tw = TracyWidom(2)
+        self.func = getattr(tw, method)
+        rng = np.random.default_rng(0)
+        self.x = rng.random(10**7) if method == 'cdfinv' \
+                else rng.normal(-1.77, 1.5, 10**7)
+        self.out = np.empty_like(self.x)
+
+    def time_eval(self, method, workers):
+        self.func(self.x, out=self.out, workers=workers)
+
+    def peakmem_eval(self, method, workers):
+        self.func(self.x, out=self.out, workers=workers)
+
+
+class EigenvaluePvalue:
+    params = [10, 1000, 100000]
+    param_names = ['matrices']
+
+    def setup(self, matrices):
+        rng = np.random.default_rng(0)
+        self.n = rng.integers(100, 1000, matrices)
+        self.p = rng.integers(10, 100, matrices)
+        mu, sigma = tw_module.wishart_scaling(self.n, self.p)
+        self.l = mu + sigma*rng.normal(-1.2, 1.3, matrices)
+
+    def time_largest(self, matrices):
+        tw_module.largest_eigenvalue_pvalue(self.l, self.n, self.p)
+
+
+class ScipyStats:
+    params = _betas
+    param_names = ['beta']
+
+    def setup(self, beta):
+        self.dist = tw_module.tracywidom_gen(beta=beta)
+        self.data = self.dist.rvs(loc=0.5, scale=1.5, size=10000, random_state=0)
+        self.q = np.random.default_rng(0).random(10000)
+
+    def time_ppf(self, beta):
+        self.dist.ppf(self.q)
+
+    def time_stats(self, beta):
+        self.dist.stats(moments='mvsk')
+
+    def time_fit(self, beta):
+        self.dist.fit(self.data)
@@ -42,7 +42,6 @@ setup(
         'Intended Audience :: Science/Research',
         'License :: OSI Approved :: MIT License',
         'Programming Language :: Python',
-        'Programming Language :: Python :: 2.7',
         'Programming Language :: Python :: 3.9',
         'Programming Language :: Python :: 3.10',
         'Programming Language :: Python :: 3.11',
@@ -53,5 +52,6 @@ setup(
     ],
     keywords='Tracy-Widom',
     py_modules=["TracyWidom"],
-    install_requires=["numpy>=1.7", "scipy>=0.13", "numdifftools>=0.9.41"],
+    python_requires='>=3.7',
+    install_requires=["numpy>=1.17", "scipy>=0.19"],
 )
@@ -0,0 +1,175 @@
+import os
+import pytest
+import numpy as np
+import TracyWidom as tw_module
+from TracyWidom import TracyWidom
+
+_betas = (1, 2, 4)
+
+
+def test_table_nodes():
+    # the spline has to reproduce the embedded table at its nodes
+    for beta in _betas:
+        tw = TracyWidom(beta)
+        x, y = tw_module._load_table(beta)
+        x, y = x[1:-1], y[1:-1]
+        assert np.abs(tw.cdf(x) - y).max() < 1.e-12
+        assert np.abs(tw.sf(x) - (1.-y)).max() < 1.e-12
+        # and stay within the 6-digit rounding between them
+        xm = 0.5*(x[1:] + x[:-1])
+        ym = 0.5*(y[1:] + y[:-1])
+        assert np.abs(tw.cdf(xm) - ym).max() < 1.e-4
+
+
+def test_spline():
+    # same not-a-knot cubic spline as scipy's make_interp_spline
+    from scipy.interpolate import make_interp_spline
+    for beta in _betas:
+        x, y = tw_module._load_table(beta)
+        spline = tw_module._UniformSpline(x[0], x[1]-x[0], y)
+        ref = make_interp_spline(x, y, k=3)
+        xx = np.linspace(x[0], x[-1], 10001)
+        assert np.abs(spline(xx) - ref(xx)).max() < 1.e-12
+        assert np.abs(spline(xx, nu=1) - ref(xx, 1)).max() < 1.e-10
+        assert abs(spline(float(xx[17])) - ref(xx[17])) < 1.e-12
+
+
+def test_continuity():
+    eps = 1.e-9
+    for beta in _betas:
+        tw = TracyWidom(beta)
+        for x0 in tw._TracyWidom__xlim:
+            x = np.array([x0 - eps, x0 + eps])
+            for func in (tw.cdf, tw.sf, tw.pdf, tw.logcdf, tw.logsf, tw.logpdf):
+                y = func(x)
+                assert abs(y[1] - y[0]) <= 1.e-7 * abs(y).max(), func.__name__
+        for q0 in tw._TracyWidom__ylim:
+            q = np.array([q0*(1.-eps), q0*(1.+eps)]) if q0 < 0.5 \
+                    else 1. - np.array([1.+eps, 1.-eps])*(1.-q0)
+            x = tw.cdfinv(q)
+            assert abs(x[1] - x[0]) < 1.e-6
+
+
+def test_tail_asymptotics(tmp_path):
+    # the asymptotic tails against the Fredholm determinants, where these
+    # still resolve cdf and 1 - cdf
+    x = np.linspace(-9., 9., 361)
+    for beta in _betas:
+        y = tw_module._fredholm_cdf(x, beta)
+        ok_n, ok_p = y > 1.e-12, 1.-y > 1.e-12
+        # the embedded tables end early on the right, before the expansion
+        # is accurate for beta = 2 and 4: sf is 25% and 76% off there
+        for tw, tol_p in ((TracyWidom(beta), {1: 0.05, 2: 0.35, 4: 0.6}[beta]),
+                (TracyWidom(beta, table=tw_module.generate_table(beta, dx=0.05,
+                        cache_dir=str(tmp_path))), 0.04)):
+            xlim = tw._TracyWidom__xlim
+            n, p = ok_n & (x < xlim[0]), ok_p & (x > xlim[1])
+            assert n.sum() > 10 and p.sum() > 10
+            assert np.abs(tw.logcdf(x[n]) - np.log(y[n])).max() < 0.04
+            assert np.abs(tw.logsf(x[p]) - np.log1p(-y[p])).max() < tol_p
+
+
+def test_moments():
+    x, dx = np.linspace(-30, 30, 300001, retstep=True)
+    for beta in _betas:
+        tw = TracyWidom(beta)
+        pdf = tw.pdf(x) * dx
+        assert abs(pdf.sum() - 1.) < 1.e-6
+        mean = (x*pdf).sum()
+        var = ((x-mean)**2*pdf).sum()
+        stats = tw_module._moments[beta]
+        assert abs(mean - stats[0]) < 2.e-4
+        assert abs(var/stats[1] - 1.) < 2.e-3
+        skew = ((x-mean)**3*pdf).sum()/var**1.5
+        kurt = ((x-mean)**4*pdf).sum()/var**2 - 3.
+        entropy = -(pdf*np.where(pdf > 0, tw.logpdf(x), 0.)).sum()
+        assert abs(skew - stats[2]) < 2.e-3
+        assert abs(kurt - stats[3]) < 5.e-3
+        assert abs(entropy - stats[4]) < 2.e-4
+
+
+def test_cdfinv_roundtrip():
+    q = np.linspace(0.001, 0.999, 999)
+    for beta in _betas:
+        tw = TracyWidom(beta)
+        assert np.abs(tw.cdf(tw.cdfinv(q)) - q).max() < 1.e-8
+        # only where cdf is strictly increasing at the table's precision
+        x = np.linspace(-7, 3, 1001)
+        x = x[tw.pdf(x) > 1.e-3]
+        assert np.abs(tw.cdfinv(tw.cdf(x)) - x).max() < 1.e-5
+        assert np.all(np.diff(tw.cdfinv(np.linspace(0, 1, 100001))) >= 0)
+
+
+def test_cdfinv_tol():
+    q = np.linspace(0.001, 0.999, 999)
+    for beta in _betas:
+        tw = TracyWidom(beta)
+        x = tw.cdfinv(q, tol=1.e-12)
+        assert np.abs(tw.cdf(x) - q).max() < 1.e-14
+        assert tw.cdfinv(q[17], tol=1.e-12) == x[17]
+        x = np.linspace(-7, 3, 1001)
+        x = x[tw.pdf(x) > 1.e-3]
+        assert np.abs(tw.cdfinv(tw.cdf(x), tol=1.e-12) - x).max() < 1.e-10
+
+
+def test_generate_table(tmp_path):
+    for beta in _betas:
+        path = tw_module.generate_table(beta, xlim=(-4., 1.), dx=0.05,
+                                        cache_dir=str(tmp_path))
+        assert tw_module.generate_table(beta, xlim=(-4., 1.), dx=0.05,
+                                        cache_dir=str(tmp_path)) == path
+        tw = TracyWidom(beta, table=path)
+        x = np.linspace(-3.9, 0.9, 49)
+        ref = tw_module._fredholm_cdf(x, beta, 40)
+        assert np.abs(tw.cdf(x) - ref).max() < 1.e-6
+        # and agrees with the embedded table to its 6 digits
+        assert np.abs(tw.cdf(x) - TracyWidom(beta).cdf(x)).max() < 2.e-4
+        assert tw.cdfinv(0.5) == tw.cdfinv(np.array([0.5]))[0]
+        with pytest.raises(ValueError):
+            TracyWidom(2 if beta != 2 else 4, table=path)
+
+
+def test_generate_table_xlim(tmp_path):
+    # ranges whose ends the quadrature cannot resolve are refused, and
+    # nothing is written for them
+    for beta, xlim in ((4, (-8., 4.)), (1, (-12., 9.)), (2, (-8., 4.))):
+        with pytest.raises(ValueError):
+            tw_module.generate_table(beta, xlim=xlim, dx=0.05,
+                                     cache_dir=str(tmp_path))
+    assert not tmp_path.exists() or not os.listdir(str(tmp_path))
+
+
+def test_inverse_lookup():
+    # the guide-table lookup of arrays finds the same interval as the
+    # binary search of scalars, including at the knots themselves
+    for beta in _betas:
+        inverse = TracyWidom(beta)._TracyWidom__inverse
+        y = inverse._MonotoneInverse__y
+        q = np.concatenate([y, np.nextafter(y, 0), np.nextafter(y, 1),
+                            np.random.default_rng(beta).random(1000)])
+        x = inverse(q)
+        assert all(inverse(float(qq)) == xx for qq, xx in zip(q, x))
+
+
+def test_generate_table_concurrent(tmp_path):
+    # threads racing to create the cache directory and write the same table
+    from concurrent.futures import ThreadPoolExecutor
+    cache_dir = str(tmp_path / 'new' / 'dir')
+    generate = lambda _: tw_module.generate_table(2, xlim=(-4., 1.), dx=0.01,
+                                                  quad_points=10, cache_dir=cache_dir)
+    with ThreadPoolExecutor(8) as executor:
+        paths = list(executor.map(generate, range(8)))
+    assert len(set(paths)) == 1
+    assert sorted(os.listdir(cache_dir)) == [os.path.basename(paths[0])]
+    assert abs(TracyWidom(2, table=paths[0]).cdf(-1.) - TracyWidom(2).cdf(-1.)) < 1.e-3
+
+
+def test_generated_table_inverse(tmp_path):
+    # cdfinv inverts the table wherever cdf uses it, also beyond x = 4
+    tw = TracyWidom(2, table=tw_module.generate_table(2, quad_points=20,
+                                                      cache_dir=str(tmp_path)))
+    x = np.linspace(-7, 4.49, 1149)
+    x = x[np.minimum(tw.cdf(x), tw.sf(x)) > 1.e-9]
+    assert x.max() > 4.2
+    assert np.abs(tw.cdfinv(tw.cdf(x)) - x).max() < 1.e-6
+    assert np.abs(tw.cdfinv(tw.cdf(x), tol=1.e-12) - x).max() < 1.e-8
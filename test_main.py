@@ -1,4 +1,7 @@
+import pickle
+import pytest
 import numpy as np
+import TracyWidom as tw_module
 from TracyWidom import TracyWidom
 
 
@@ -13,5 +16,248 @@ def test_main():
         cdfinv = tw.cdfinv(y)
 
 
+def test_pdf():
+    x = np.linspace(-10, 10, 2001)
+    dx = 1.e-5
+
+    for beta in (1, 2, 4):
+        tw = TracyWidom(beta)
+        pdf = tw.pdf(x)
+        pdf_fd = (tw.cdf(x+dx) - tw.cdf(x-dx)) / (2.*dx)
+        assert np.allclose(pdf, pdf_fd, rtol=0, atol=1.e-6)
+        assert np.all(pdf >= 0)
+        assert np.isscalar(tw.pdf(0.))
+
+    # the beta=2 table dips near x = 2.455, which the grid above skips
+    tw = TracyWidom(2)
+    x = np.arange(2.44, 2.47, 1.e-5)
+    assert np.all(tw.pdf(x) >= 0)
+    assert not np.isnan(tw.logpdf(x)).any()
+    assert all(tw.pdf(xi) >= 0 and not np.isnan(tw.logpdf(xi)) for xi in x[::10])
+
+
+def test_shared():
+    for i, beta in enumerate((1, 2, 4)):
+        tw = TracyWidom(beta)
+        assert tw.beta == beta
+
+        # the embedded (u, v) must match what _find_u_v gives on the tables
+        xlim = tw._TracyWidom__xlim
+        cdf = tw._TracyWidom__spline
+        pdf = lambda x: cdf(x, nu=1)
+        uv_n = tw_module._find_u_v(-xlim[0], cdf(xlim[0]), -pdf(xlim[0])/cdf(xlim[0]), *tw_module._para_n[i])
+        uv_p = tw_module._find_u_v(xlim[1], 1.-cdf(xlim[1]), -pdf(xlim[1])/(1.-cdf(xlim[1])), *tw_module._para_p[i])
+        assert np.allclose(uv_n, tw_module._uv_n[i], rtol=1.e-8)
+        assert np.allclose(uv_p, tw_module._uv_p[i], rtol=1.e-8)
+        assert tw._TracyWidom__spline is TracyWidom(beta)._TracyWidom__spline
+
+
+def test_rvs():
+    rng = np.random.default_rng(0)
+    for beta in (1, 2, 4):
+        tw = TracyWidom(beta)
+        r = tw.rvs(100000, random_state=rng)
+        assert r.shape == (100000,)
+        assert np.isfinite(r).all()
+        # Kolmogorov-Smirnov distance against cdf
+        r.sort()
+        d = np.abs(tw.cdf(r) - np.arange(1, r.size+1)/r.size).max()
+        assert d < 0.01
+
+        assert np.isscalar(tw.rvs())
+        assert abs(tw.rvs(random_state=2) - tw.rvs(1, random_state=2)[0]) < 1.e-12
+        out = np.empty((3, 5000))
+        assert tw.rvs(random_state=1, out=out) is out
+        assert np.array_equal(out.ravel(), tw.rvs(15000, random_state=1))
+        chunks = [c.copy() for c in tw.rvs_chunks(15000, 4000, random_state=1)]
+        assert [c.size for c in chunks] == [4000, 4000, 4000, 3000]
+        assert np.array_equal(np.concatenate(chunks), out.ravel())
+        chunks = [c.copy() for c in tw.rvs_chunks(1.5e4, 4e3, random_state=1)]
+        assert np.array_equal(np.concatenate(chunks), out.ravel())
+        assert list(tw.rvs_chunks(0)) == []
+        with pytest.raises(ValueError):
+            tw.rvs_chunks(10, 0)
+        with pytest.raises(ValueError):
+            tw.rvs_chunks(-1)
+
+
+
+def test_rvs_tails():
+    # the rejection samplers follow the asymptotic tails that cdf uses
+    for beta in (1, 2, 4):
+        tw = TracyWidom(beta)
+        lim = tw._TracyWidom__rvs_lim
+        x_n, x_p = tw.cdfinv(lim[0]), tw.cdfinv(lim[1])
+        rng = np.random.default_rng(beta)
+        streams = [rng, rng]
+        y = -np.sort(tw._TracyWidom__tail_draw(0, 20000, streams))
+        d = np.abs(tw.cdf(y)/lim[0] - np.arange(20000, 0, -1)/20000.).max()
+        assert y.max() <= x_n and d < 0.015
+        y = np.sort(tw._TracyWidom__tail_draw(1, 20000, streams))
+        d = np.abs(1. - tw.sf(y)/tw.sf(x_p) - np.arange(1, 20001)/20000.).max()
+        assert y.min() >= x_p and d < 0.015
+
+    # tail draws in rvs do not depend on the chunking
+    tw = TracyWidom(1)
+    r = tw.rvs(200000, random_state=3)
+    assert (r > tw.cdfinv(tw._TracyWidom__rvs_lim[1])).sum() > 10
+    chunks = [c.copy() for c in tw.rvs_chunks(200000, 7777, random_state=3)]
+    assert np.array_equal(np.concatenate(chunks), r)
+
+
+def test_tail_inverse():
+    q = np.array([1.e-300, 1.e-30, 1.e-12])
+    for beta in (1, 2, 4):
+        tw = TracyWidom(beta)
+        x = tw.cdfinv(q)
+        assert np.isfinite(x).all()
+        assert np.isfinite(tw.cdfinv(1.-q[-1]))
+
+
+def test_log_and_sf():
+    x = np.linspace(-7, 5, 1201)
+    for beta in (1, 2, 4):
+        tw = TracyWidom(beta)
+        cdf = tw.cdf(x)
+        sf = tw.sf(x)
+        assert np.allclose(sf, 1.-cdf, rtol=0, atol=1.e-15)
+        assert np.allclose(tw.logcdf(x), np.log(cdf))
+        assert np.allclose(tw.logsf(x), np.log(sf))
+        pdf = tw.pdf(x)
+        ok = pdf > 0
+        assert np.allclose(tw.logpdf(x[ok]), np.log(pdf[ok]))
+
+        # deep tails stay finite and monotone where cdf/1-cdf would not
+        xt = np.array([-40., -20., 20., 40.])
+        logcdf = tw.logcdf(xt)
+        logsf = tw.logsf(xt)
+        assert np.isfinite(logcdf).all() and np.isfinite(logsf).all()
+        assert logcdf[0] < logcdf[1] and logsf[3] < logsf[2] < 0
+        assert tw.sf(20.) > 0
+        assert np.isfinite(tw.logpdf(xt)).all()
+        assert tw.cdf(np.inf) == 1 and tw.sf(np.inf) == 0
+        assert tw.pdf(np.inf) == 0 and tw.pdf(-np.inf) == 0
+
+
+def test_out_and_dtype():
+    x = np.linspace(-10, 10, 20001).reshape(3, -1)
+    q = np.linspace(0, 1, 20001).reshape(3, -1)
+    tw = TracyWidom(2)
+    for name in ('cdf', 'pdf', 'sf', 'logcdf', 'logsf', 'logpdf', 'cdfinv'):
+        func = getattr(tw, name)
+        xx = q if name == 'cdfinv' else x
+        y = func(xx)
+        assert y.shape == xx.shape and y.dtype == np.float64
+        assert func(xx[1, 7]) == y[1, 7]
+
+        out = np.empty_like(xx)
+        assert func(xx, out=out) is out
+        assert np.array_equal(out, y, equal_nan=True)
+
+        out = np.empty((xx.shape[1], 3)).T
+        func(xx, out=out)
+        assert np.array_equal(out, y, equal_nan=True)
+        assert np.array_equal(func(xx[:, ::3]), y[:, ::3], equal_nan=True)
+
+        y32 = func(xx.astype(np.float32))
+        assert y32.dtype == np.float32
+        assert isinstance(func(np.float32(xx[1, 7])), np.float32)
+
+    xx = q.copy()
+    assert tw.cdfinv(xx, out=xx) is xx
+    assert np.array_equal(xx, tw.cdfinv(q), equal_nan=True)
+
+
+
+def test_chunks_and_workers():
+    x = np.linspace(-10, 10, 20001).reshape(3, -1)
+    q = np.linspace(0, 1, 20001).reshape(3, -1)
+    tw = TracyWidom(1)
+    for name in ('cdf', 'pdf', 'sf', 'logcdf', 'logsf', 'logpdf', 'cdfinv'):
+        func = getattr(tw, name)
+        xx = q if name == 'cdfinv' else x
+        y = func(xx)
+        for chunk_size, workers in ((1000, None), (777, 3), (None, -1), (64, 1)):
+            yy = func(xx, chunk_size=chunk_size, workers=workers)
+            assert np.array_equal(yy, y, equal_nan=True)
+            out = np.empty((xx.shape[1], 3)).T
+            func(xx[:, ::-1], out=out, chunk_size=chunk_size, workers=workers)
+            assert np.array_equal(out, y[:, ::-1], equal_nan=True)
+    y = tw.cdfinv(q, tol=1.e-12)
+    assert np.array_equal(tw.cdfinv(q, tol=1.e-12, chunk_size=500, workers=2), y)
+    xx = q.copy()
+    tw.cdfinv(xx, out=xx, chunk_size=999, workers=4)
+    assert np.array_equal(xx, tw.cdfinv(q), equal_nan=True)
+    with pytest.raises(ValueError):
+        tw.cdf(x, chunk_size=0)
+    with pytest.raises(ValueError):
+        tw.cdf(x, workers=0)
+
+
+def test_eigenvalue_pvalue():
+    n = np.array([100, 200, 400])
+    p = np.array([[10], [50]])
+    l = np.full((2, 3), 300.)
+    mu, sigma = tw_module.wishart_scaling(n, p)
+    mu_ref = (np.sqrt(n-1) + np.sqrt(p))**2
+    sigma_ref = (np.sqrt(n-1) + np.sqrt(p))*(1/np.sqrt(n-1) + 1/np.sqrt(p))**(1/3)
+    assert np.allclose(mu, mu_ref) and np.allclose(sigma, sigma_ref)
+    pv = tw_module.largest_eigenvalue_pvalue(l, n, p)
+    assert pv.shape == (2, 3)
+    assert np.array_equal(pv, TracyWidom(1).sf((l - mu_ref)/sigma_ref))
+    assert pv[1, 2] == tw_module.largest_eigenvalue_pvalue(300., 400, 50)
+    assert np.array_equal(tw_module.kth_eigenvalue_pvalue(l, n, p + 2, 3), pv)
+
+    mu, sigma = tw_module.wishart_scaling(200, 50, beta=2)
+    assert np.isclose(mu, (200**0.5 + 50**0.5)**2)
+    assert tw_module.largest_eigenvalue_pvalue(mu, 200, 50, beta=2) == \
+            TracyWidom(2).sf(0.)
+
+    # the p-values of white Wishart matrices are about uniform
+    rng = np.random.default_rng(0)
+    x = rng.standard_normal((500, 100, 20))
+    l = np.linalg.eigvalsh(np.swapaxes(x, 1, 2) @ x)[:, -1]
+    pv = tw_module.largest_eigenvalue_pvalue(l, 100, 20)
+    assert abs(pv.mean() - 0.5) < 0.05
+    assert abs((pv < 0.1).mean() - 0.1) < 0.04
+
+    with pytest.raises(ValueError, match='at least 2'):
+        tw_module.largest_eigenvalue_pvalue(l, 1, 20)
+    assert tw_module.largest_eigenvalue_pvalue(10., 2, 5) > 0
+    with pytest.raises(ValueError, match='at least 1'):
+        tw_module.largest_eigenvalue_pvalue(l, 0, 20, beta=2)
+    assert tw_module.largest_eigenvalue_pvalue(10., 1, 5, beta=2) > 0
+    with pytest.raises(ValueError):
+        tw_module.largest_eigenvalue_pvalue(l, 100, 20, beta=4)
+    with pytest.raises(ValueError):
+        tw_module.kth_eigenvalue_pvalue(l, 100, 20, 21)
+
+
+def test_scipy_stats():
+    for beta in (1, 2, 4):
+        tw = TracyWidom(beta)
+        dist = tw_module.tracywidom_gen(beta=beta)
+        assert dist.beta == beta and dist.name == 'tracywidom{0}'.format(beta)
+        x = np.linspace(-8, 6, 141)
+        for name in ('cdf', 'sf', 'pdf', 'logcdf', 'logsf', 'logpdf'):
+            assert np.array_equal(getattr(dist, name)(x), getattr(tw, name)(x))
+        q = np.linspace(0.01, 0.99, 99)
+        assert np.allclose(dist.ppf(q, loc=1., scale=2.), 1. + 2.*tw.cdfinv(q))
+        assert dist.mean() == tw_module._moments[beta][0]
+        assert dist.entropy() == tw_module._moments[beta][4]
+
+        data = dist.rvs(loc=0.5, scale=1.5, size=5000, random_state=0)
+        assert data.shape == (5000,)
+        assert np.array_equal(data, dist.rvs(loc=0.5, scale=1.5, size=5000, \
+                random_state=np.random.RandomState(0)))
+        assert np.array_equal(dist.rvs(size=7, random_state=np.random.default_rng(1)), \
+                tw.cdfinv(np.random.default_rng(1).uniform(size=7)))
+        loc, scale = dist.fit(data)
+        assert abs(loc - 0.5) < 0.1 and abs(scale - 1.5) < 0.1
+
+        frozen = pickle.loads(pickle.dumps(dist(loc=1.)))
+        assert frozen.dist.beta == beta
+        assert frozen.cdf(1.5) == tw.cdf(0.5)
+
 if __name__ == '__main__':
     test_main()